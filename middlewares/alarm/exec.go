@@ -8,6 +8,7 @@ import (
 	"os/exec"
 	"path/filepath"
 	"runtime"
+	"strconv"
 	"strings"
 
 	mw "iron/internal/middleware"
@@ -115,12 +116,21 @@ func runTimerTool(tc mw.ToolCall) string {
 	seconds := int(minutes * 60)
 	var cmd *exec.Cmd
 
+	// The message is always passed as its own argv element, never spliced into
+	// script source, so quotes or shell metacharacters in it are inert.
+	secs := strconv.Itoa(seconds)
 	if runtime.GOOS == "darwin" {
-		shCmd := fmt.Sprintf(`sleep %d && osascript -e 'display notification "%s" with title "IRon Timer"'`, seconds, message)
-		cmd = exec.Command("sh", "-c", shCmd)
+		// osascript sleeps and notifies itself: a single process, no shell
+		cmd = exec.Command("osascript",
+			"-e", "on run argv",
+			"-e", "delay (item 1 of argv as integer)",
+			"-e", `display notification (item 2 of argv) with title "IRon Timer"`,
+			"-e", "end run",
+			secs, message)
 	} else if runtime.GOOS == "linux" {
-		shCmd := fmt.Sprintf(`sleep %d && notify-send "IRon Timer" "%s"`, seconds, message)
-		cmd = exec.Command("sh", "-c", shCmd)
+		// $1/$2 are positional args; exec replaces the shell with notify-send
+		cmd = exec.Command("sh", "-c", `sleep "$1" && exec notify-send "IRon Timer" "$2"`,
+			"iron-timer", secs, message)
 	} else {
 		return "timer.set: background timers are currently only supported on Linux and macOS"
 	}
@@ -130,7 +140,9 @@ func runTimerTool(tc mw.ToolCall) string {
 		return fmt.Sprintf("timer.set failed to start: %v", err)
 	}
 
-	// We intentionally do not call cmd.Wait() so it becomes an orphan/background process
+	// Reap the child if IRon is still running when it finishes; if IRon exits
+	// first the timer simply carries on as an orphan.
+	go cmd.Wait()
 
 	return fmt.Sprintf("ok: timer set for %.1f minutes with message: '%s'", minutes, message)
 }
@@ -0,0 +1,129 @@
+package pytools
+
+import (
+	"bufio"
+	"encoding/json"
+	"errors"
+	"fmt"
+	"io"
+	"os/exec"
+	"path/filepath"
+	"sync"
+	"time"
+)
+
+// hostScript is the long-lived Python process that imports tool scripts once
+// and serves calls over stdin/stdout JSON lines. Its leading underscore keeps
+// it out of discoverScripts.
+const hostScript = "_tool_host.py"
+
+// hostCallTimeout bounds a single tool call. The host serves one call at a
+// time, so a tool stuck waiting (a browser OAuth flow, a stalled download)
+// would otherwise block every later call; on expiry the host is killed and
+// the next call starts a fresh one.
+const hostCallTimeout = 5 * time.Minute
+
+type hostRequest struct {
+	Tool string   `json:"tool"`
+	Argv []string `json:"argv"`
+}
+
+type hostResponse struct {
+	Output string `json:"output"`
+	Code   int    `json:"code"`
+}
+
+// errHostUnavailable marks failures that happened before a request reached
+// the host. Only then is it safe to run the tool another way; after that the
+// tool may already have had side effects.
+var errHostUnavailable = errors.New("tool host unavailable")
+
+// pyHost owns the tool host process. Calls are serialized: the protocol is a
+// single request/response stream.
+type pyHost struct {
+	mu      sync.Mutex
+	newCmd  func() *exec.Cmd // nil means python3 scripts/_tool_host.py
+	timeout time.Duration    // per-call limit; zero means hostCallTimeout
+	cmd     *exec.Cmd
+	stdin   io.WriteCloser
+	stdout  *bufio.Reader
+}
+
+var host pyHost
+
+func (h *pyHost) start() error {
+	var cmd *exec.Cmd
+	if h.newCmd != nil {
+		cmd = h.newCmd()
+	} else {
+		cmd = exec.Command("python3", filepath.Join(scriptsDir, hostScript))
+	}
+	stdin, err := cmd.StdinPipe()
+	if err != nil {
+		return err
+	}
+	stdout, err := cmd.StdoutPipe()
+	if err != nil {
+		return err
+	}
+	if err := cmd.Start(); err != nil {
+		return err
+	}
+	h.cmd, h.stdin, h.stdout = cmd, stdin, bufio.NewReader(stdout)
+	return nil
+}
+
+func (h *pyHost) stop() {
+	if h.cmd == nil {
+		return
+	}
+	h.stdin.Close()
+	h.cmd.Process.Kill()
+	h.cmd.Wait()
+	h.cmd, h.stdin, h.stdout = nil, nil, nil
+}
+
+// call runs one tool in the host, starting it on first use. Any protocol
+// failure tears the host down so the next call starts a fresh one. Errors
+// wrapping errHostUnavailable mean the tool did not run.
+func (h *pyHost) call(name string, argv []string) (hostResponse, error) {
+	h.mu.Lock()
+	defer h.mu.Unlock()
+
+	var resp hostResponse
+	if h.cmd == nil {
+		if err := h.start(); err != nil {
+			return resp, fmt.Errorf("%w: start: %v", errHostUnavailable, err)
+		}
+	}
+
+	req, err := json.Marshal(hostRequest{Tool: name, Argv: argv})
+	if err != nil {
+		return resp, fmt.Errorf("%w: encode request: %v", errHostUnavailable, err)
+	}
+	if _, err := h.stdin.Write(append(req, '\n')); err != nil {
+		h.stop()
+		return resp, fmt.Errorf("%w: write: %v", errHostUnavailable, err)
+	}
+	timeout := h.timeout
+	if timeout <= 0 {
+		timeout = hostCallTimeout
+	}
+	// killing the process unblocks the read below with EOF
+	proc := h.cmd.Process
+	timer := time.AfterFunc(timeout, func() { proc.Kill() })
+	line, err := h.stdout.ReadBytes('\n')
+	if !timer.Stop() {
+		h.stop()
+		return resp, fmt.Errorf("timed out after %v", timeout)
+	}
+	if err != nil {
+		h.stop()
+		return resp, fmt.Errorf("tool host read: %w", err)
+	}
+	if err := json.Unmarshal(line, &resp); err != nil {
+		h.stop()
+		return resp, fmt.Errorf("tool host reply: %w", err)
+	}
+	return resp, nil
+}
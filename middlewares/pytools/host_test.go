@@ -0,0 +1,131 @@
+package pytools
+
+import (
+	"bufio"
+	"encoding/json"
+	"os"
+	"os/exec"
+	"path/filepath"
+	"strings"
+	"testing"
+	"time"
+)
+
+// helperHost returns a pyHost whose process is this test binary running
+// TestHelperHost in the given mode, standing in for python3 _tool_host.py.
+func helperHost(mode string) *pyHost {
+	return &pyHost{newCmd: func() *exec.Cmd {
+		cmd := exec.Command(os.Args[0], "-test.run=^TestHelperHost$")
+		cmd.Env = append(os.Environ(), "PYTOOLS_HELPER_HOST="+mode)
+		return cmd
+	}}
+}
+
+// TestHelperHost is not a real test: it speaks the tool host protocol when
+// launched by helperHost and does nothing otherwise.
+func TestHelperHost(t *testing.T) {
+	mode := os.Getenv("PYTOOLS_HELPER_HOST")
+	if mode == "" {
+		return
+	}
+	in := bufio.NewScanner(os.Stdin)
+	out := json.NewEncoder(os.Stdout)
+	for in.Scan() {
+		var req hostRequest
+		if err := json.Unmarshal(in.Bytes(), &req); err != nil {
+			os.Exit(3)
+		}
+		switch mode {
+		case "die":
+			os.Exit(1)
+		case "hang":
+			select {}
+		case "fail":
+			out.Encode(hostResponse{Output: "bad flag", Code: 2})
+		default:
+			out.Encode(hostResponse{Output: req.Tool + " " + strings.Join(req.Argv, " ")})
+		}
+	}
+	os.Exit(0)
+}
+
+func TestRunViaHostReusesRunningHost(t *testing.T) {
+	h := helperHost("echo")
+	defer h.stop()
+
+	out, handled := runViaHost(h, "repo_map", []string{"--depth", "2"})
+	if !handled || out != "repo_map --depth 2" {
+		t.Fatalf("unexpected result: handled=%v out=%q", handled, out)
+	}
+	first := h.cmd
+
+	out, handled = runViaHost(h, "system_info", nil)
+	if !handled || out != "system_info " {
+		t.Fatalf("unexpected result: handled=%v out=%q", handled, out)
+	}
+	if h.cmd != first {
+		t.Fatalf("expected the second call to reuse the host process")
+	}
+}
+
+func TestRunViaHostReportsExitCode(t *testing.T) {
+	h := helperHost("fail")
+	defer h.stop()
+
+	out, handled := runViaHost(h, "repo_map", []string{"--bogus", "x"})
+	if !handled {
+		t.Fatalf("expected the host to handle the call")
+	}
+	if out != "Execution Error: exit status 2\nOutput: bad flag" {
+		t.Fatalf("unexpected output: %q", out)
+	}
+}
+
+func TestRunViaHostNoFallbackAfterSend(t *testing.T) {
+	h := helperHost("die")
+	defer h.stop()
+
+	// The request was delivered before the host died, so the tool may have
+	// run: the caller must not rerun it with the one-shot interpreter.
+	out, handled := runViaHost(h, "pkg_manager", []string{"--action", "install"})
+	if !handled {
+		t.Fatalf("expected no fallback once the request was sent")
+	}
+	if !strings.HasPrefix(out, "Execution Error:") {
+		t.Fatalf("expected an execution error, got: %q", out)
+	}
+	if h.cmd != nil {
+		t.Fatalf("expected the dead host to be torn down")
+	}
+}
+
+func TestRunViaHostFallsBackWhenHostCannotStart(t *testing.T) {
+	missing := filepath.Join(t.TempDir(), "no-such-host")
+	h := &pyHost{newCmd: func() *exec.Cmd { return exec.Command(missing) }}
+
+	if _, handled := runViaHost(h, "repo_map", nil); handled {
+		t.Fatalf("expected fallback when the host cannot start")
+	}
+}
+
+func TestRunViaHostTimesOutStuckCall(t *testing.T) {
+	h := helperHost("hang")
+	h.timeout = 200 * time.Millisecond
+	defer h.stop()
+
+	// The tool may have run, so a timeout is reported rather than retried.
+	out, handled := runViaHost(h, "google_calendar", nil)
+	if !handled || !strings.HasPrefix(out, "Execution Error: timed out") {
+		t.Fatalf("unexpected result: handled=%v out=%q", handled, out)
+	}
+	if h.cmd != nil {
+		t.Fatalf("expected the stuck host to be torn down")
+	}
+
+	// The next call must not be blocked by the stuck one.
+	h.newCmd = helperHost("echo").newCmd
+	out, handled = runViaHost(h, "system_info", nil)
+	if !handled || out != "system_info " {
+		t.Fatalf("unexpected result after timeout: handled=%v out=%q", handled, out)
+	}
+}
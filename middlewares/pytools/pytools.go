@@ -3,6 +3,7 @@ package pytools
 import (
 	"context"
 	"encoding/json"
+	"errors"
 	"fmt"
 	"os"
 	"os/exec"
@@ -88,7 +89,8 @@ func (PyToolsMode) discoverScripts() ([]scriptInfo, error) {
 
 	var infos []scriptInfo
 	for _, f := range files {
-		if f.IsDir() || !strings.HasSuffix(f.Name(), ".py") {
+		// "_"-prefixed files are helpers (e.g. the tool host), not tools
+		if f.IsDir() || !strings.HasSuffix(f.Name(), ".py") || strings.HasPrefix(f.Name(), "_") {
 			continue
 		}
 		name := strings.TrimSuffix(f.Name(), ".py")
@@ -140,7 +142,8 @@ func extractMetadata(content string) *pyMetadata {
 }
 
 // PyToolsExec intercepts tool calls starting with "py_" and executes
-// the corresponding script in scripts/ using python3.
+// the corresponding script in scripts/, through the shared tool host when
+// available and a one-shot python3 otherwise.
 type PyToolsExec struct{}
 
 func (PyToolsExec) ID() string    { return "pytools_exec" }
@@ -195,16 +198,24 @@ func runPyScript(name string, args map[string]any) string {
 		return fmt.Sprintf("Error: script %s not found in %s/", name, scriptsDir)
 	}
 
-	cmdArgs := []string{scriptPath}
+	var argv []string
 
 	// Simple mapping of JSON args to CLI flags: {"root": "."} -> --root .
 	for k, v := range args {
 		// Use --key=value format for safety with complex strings
 		val := fmt.Sprintf("%v", v)
-		cmdArgs = append(cmdArgs, fmt.Sprintf("--%s", k), val)
+		argv = append(argv, fmt.Sprintf("--%s", k), val)
 	}
 
-	cmd := exec.Command("python3", cmdArgs...)
+	// Prefer the warm tool host; fall back to a one-shot interpreter only if
+	// it is missing or the request never reached it.
+	if _, err := os.Stat(filepath.Join(scriptsDir, hostScript)); err == nil {
+		if out, handled := runViaHost(&host, name, argv); handled {
+			return out
+		}
+	}
+
+	cmd := exec.Command("python3", append([]string{scriptPath}, argv...)...)
 	out, err := cmd.CombinedOutput()
 	if err != nil {
 		return fmt.Sprintf("Execution Error: %v\nOutput: %s", err, string(out))
@@ -212,3 +223,20 @@ func runPyScript(name string, args map[string]any) string {
 
 	return string(out)
 }
+
+// runViaHost runs the tool in the shared host. handled is false only when the
+// request never reached the host, so the caller can rerun the tool without
+// risking a second execution (a repeated install, a kill of a dead PID...).
+func runViaHost(h *pyHost, name string, argv []string) (out string, handled bool) {
+	resp, err := h.call(name, argv)
+	if errors.Is(err, errHostUnavailable) {
+		return "", false
+	}
+	if err != nil {
+		return fmt.Sprintf("Execution Error: %v", err), true
+	}
+	if resp.Code != 0 {
+		return fmt.Sprintf("Execution Error: exit status %d\nOutput: %s", resp.Code, resp.Output), true
+	}
+	return resp.Output, true
+}
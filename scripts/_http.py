@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+_http.py
+
+HTTP GET helper shared by network_tools.py and web_search.py. The leading
+underscore keeps it out of IRon's tool discovery.
+"""
+
+import contextlib
+import urllib.error
+import urllib.parse
+import urllib.request
+
+try:  # optional: pooled keep-alive connections reused across requests
+    import urllib3
+except ImportError:
+    urllib3 = None
+
+if urllib3 is not None:
+    # redirects get their own budget (like urllib's 10), so http -> https ->
+    # www chains still resolve while connect/read failures retry only once
+    _POOL = urllib3.PoolManager(
+        num_pools=4,
+        maxsize=8,
+        timeout=urllib3.Timeout(connect=3.0, read=10.0),
+        retries=urllib3.Retry(connect=1, read=1, redirect=10),
+    )
+else:
+    _POOL = None
+
+
+def _uses_proxy(url):
+    """
+    True if urllib would send `url` through a proxy (HTTP_PROXY, HTTPS_PROXY,
+    NO_PROXY, ...). The pool connects directly, so those requests stay on
+    urlopen.
+    """
+    parts = urllib.parse.urlsplit(url)
+    if not urllib.request.getproxies().get(parts.scheme):
+        return False
+    return not urllib.request.proxy_bypass(parts.hostname or "")
+
+
+@contextlib.contextmanager
+def open_url(url, headers):
+    """
+    GET `url` and yield a response to read the body from with read([n]).
+    Goes through the shared urllib3 pool when available and no proxy applies;
+    either way, failures are raised as urllib.error.HTTPError / URLError.
+    """
+    if _POOL is None or _uses_proxy(url):
+        req = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(req, timeout=10) as response:
+            yield response
+        return
+
+    try:
+        response = _POOL.request("GET", url, headers=headers, preload_content=False)
+    except urllib3.exceptions.HTTPError as e:
+        raise urllib.error.URLError(getattr(e, "reason", None) or e)
+    try:
+        if response.status >= 400:
+            raise urllib.error.HTTPError(
+                url, response.status, response.reason, response.headers, None
+            )
+        yield response
+    finally:
+        # a partly read body can't go back to the pool; drop that connection
+        if not response.closed:
+            response.close()
+        response.release_conn()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+_tool_host.py
+
+Long-lived host for the scripts in this directory, so IRon pays interpreter
+startup and heavy imports (google.auth, urllib3, ...) once per session instead
+of once per tool call.
+
+Protocol (one JSON object per line):
+  stdin:  {"tool": "repo_map", "argv": ["--root", ".", "--depth", "2"]}
+  stdout: {"output": "<captured stdout+stderr>", "code": 0}
+
+Each tool module is imported on first use and its main(argv) is called with
+the same flags the one-shot CLI would get; argparse exits surface as `code`.
+The leading underscore keeps this file out of IRon's tool discovery.
+"""
+
+import contextlib
+import importlib
+import io
+import json
+import os
+import re
+import sys
+import traceback
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+RE_TOOL_NAME = re.compile(r"[A-Za-z]\w*")
+
+# tool name -> (module, mtime of its file when imported)
+_MODULES = {}
+
+
+def load_tool(name):
+    """
+    Imports (or re-imports, if the file changed on disk) the tool module.
+    """
+    if not RE_TOOL_NAME.fullmatch(name):
+        raise ValueError(f"invalid tool name: {name!r}")
+    path = os.path.join(SCRIPTS_DIR, name + ".py")
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"no such tool script: {name}.py")
+    mtime = os.stat(path).st_mtime
+    cached = _MODULES.get(name)
+    if cached is not None and cached[1] == mtime:
+        return cached[0]
+    if cached is not None:
+        module = importlib.reload(cached[0])
+    else:
+        module = importlib.import_module(name)
+    _MODULES[name] = (module, mtime)
+    return module
+
+
+def run_tool(name, argv):
+    """
+    Runs one tool call, returning (combined output, exit code).
+    """
+    module = load_tool(name)
+    buf = io.StringIO()
+    code = 0
+    # argparse takes its prog name (usage/error lines) from sys.argv[0]
+    saved_argv = sys.argv
+    sys.argv = [module.__file__] + argv
+    with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+        try:
+            module.main(argv)
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.argv = saved_argv
+    return buf.getvalue(), code
+
+
+def main():
+    # Keep a private handle on the real stdout for replies, then point fd 1 at
+    # stderr so stray writes from tools or their children can't corrupt the
+    # protocol stream.
+    proto = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    os.dup2(2, 1)
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            req = json.loads(line)
+            argv = [str(a) for a in req.get("argv") or []]
+            output, code = run_tool(req["tool"], argv)
+        except Exception as e:
+            output, code = f"Tool host error: {e}\n", 1
+        proto.write(json.dumps({"output": output, "code": code}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
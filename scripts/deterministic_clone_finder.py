@@ -26,13 +26,22 @@ from __future__ import annotations
 import argparse
 import dataclasses
 import hashlib
+import heapq
+import itertools
 import json
 import os
 import re
-from collections import defaultdict, deque
+from array import array
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+try:  # optional: much faster JSON encoder, stdlib json is the fallback
+    import orjson
+except ImportError:
+    orjson = None
+
 # ----------------------------
 # Config / file filtering
 # ----------------------------
@@ -91,6 +100,20 @@ class Block:
     text: str
     norm_tokens: List[str]
     fingerprints: Set[int]
+    text_hash: int = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class ScanConfig:
+    # per-file extraction + fingerprinting settings (picklable for workers)
+    root: Path
+    mode: str
+    win_lines: int
+    win_step: int
+    min_block_lines: int
+    k: int
+    w: int
+    min_tokens: int
 
 
 # ----------------------------
@@ -98,16 +121,30 @@ class Block:
 # ----------------------------
 
 RE_WS = re.compile(r"\s+")
-RE_STR = re.compile(
-    r"""(?s)(\"\"\".*?\"\"\"|'''.*?'''|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')"""
-)
-RE_NUM = re.compile(r"\b\d+(?:\.\d+)?\b")
-RE_HEX = re.compile(r"\b0x[0-9a-fA-F]+\b")
 
-# crude comment patterns for multiple langs
-RE_LINE_COMMENT = re.compile(r"(?m)^\s*(//|#).*$")
-RE_INLINE_LINE_COMMENT = re.compile(r"(?m)(?<!:)//.*$")  # tries not to kill URLs
-RE_BLOCK_COMMENT = re.compile(r"(?s)/\*.*?\*/")
+# Comments, strings and numbers are normalized in a single scan: one
+# alternation per comment style, dispatched on the group that matched.
+# Line comments use [^\n]* since the patterns are DOTALL for block comments.
+_NORM_BLOCK_COMMENT = r"(?P<bc>/\*.*?\*/)"
+_NORM_STR = (
+    r"""(?P<str>\"\"\".*?\"\"\"|'''.*?'''"""
+    r"""|"[^"\\]*(?:\\.[^"\\]*)*"|'[^'\\]*(?:\\.[^'\\]*)*')"""
+)
+_NORM_NUM = r"(?P<num>\b0x[0-9a-fA-F]+\b|\b\d+(?:\.\d+)?\b)"
+
+# py/rb: whole-line // or # comments
+RE_NORMALIZE_PY = re.compile(
+    "|".join(
+        (_NORM_BLOCK_COMMENT, r"(?P<lc>^\s*(?://|#)[^\n]*)", _NORM_STR, _NORM_NUM)
+    ),
+    re.S | re.M,
+)
+# C-like: inline // comments (tries not to kill URLs)
+RE_NORMALIZE_C = re.compile(
+    "|".join((_NORM_BLOCK_COMMENT, r"(?P<lc>(?<!:)//[^\n]*)", _NORM_STR, _NORM_NUM)),
+    re.S,
+)
+NORM_REPL = {"bc": " ", "lc": " ", "str": " STR ", "num": " NUM "}
 
 # identifiers: keep keywords-ish, normalize most names to ID
 RE_IDENT = re.compile(r"\b[A-Za-z_][A-Za-z0-9_]*\b")
@@ -122,26 +159,20 @@ do in of nil null true false
 map filter reduce foreach
 """.split()
 )
+KEEP_IDENTS = KEYWORDS | {"STR", "NUM"}
 
+# one scan: identifier | number | single punct char; ";" and "," are dropped
+# as noise (braces/parens etc are kept)
+RE_TOKEN = re.compile(r"([^\W\d]\w*)|(\d[\d.]*)|([^\s;,])")
 
-def strip_comments(code: str, lang: str) -> str:
-    # keep it simple and deterministic
-    s = code
-    # block comments common in C-like
-    s = RE_BLOCK_COMMENT.sub(" ", s)
-    # line comments
-    if lang in {"py", "rb"}:
-        s = RE_LINE_COMMENT.sub(" ", s)
-    else:
-        s = RE_INLINE_LINE_COMMENT.sub(" ", s)
-    return s
+
+def _norm_repl(m: re.Match) -> str:
+    return NORM_REPL[m.lastgroup]
 
 
 def normalize_code(code: str, lang: str) -> str:
-    s = strip_comments(code, lang)
-    s = RE_STR.sub(" STR ", s)
-    s = RE_HEX.sub(" NUM ", s)
-    s = RE_NUM.sub(" NUM ", s)
+    regex = RE_NORMALIZE_PY if lang in {"py", "rb"} else RE_NORMALIZE_C
+    s = regex.sub(_norm_repl, code)
     # collapse whitespace
     s = RE_WS.sub(" ", s).strip()
     return s
@@ -153,40 +184,16 @@ def tokenize(code_norm: str) -> List[str]:
     Deterministic, low-tech.
     """
     tokens: List[str] = []
-    i = 0
-    n = len(code_norm)
-    while i < n:
-        ch = code_norm[i]
-        if ch.isspace():
-            i += 1
-            continue
-        # identifier
-        if ch.isalpha() or ch == "_":
-            j = i + 1
-            while j < n and (code_norm[j].isalnum() or code_norm[j] == "_"):
-                j += 1
-            tok = code_norm[i:j]
-            if tok in KEYWORDS:
-                tokens.append(tok)
-            elif tok in {"STR", "NUM"}:
-                tokens.append(tok)
-            else:
-                tokens.append("ID")
-            i = j
-            continue
-        # numbers already normalized to NUM, but keep any leftover digits
-        if ch.isdigit():
-            j = i + 1
-            while j < n and (code_norm[j].isdigit() or code_norm[j] == "."):
-                j += 1
-            tokens.append("NUM")
-            i = j
-            continue
-        # operators/punct (single char; enough for similarity)
-        tokens.append(ch)
-        i += 1
-    # remove trivial tokens that create noise
-    tokens = [t for t in tokens if t not in {";", ","}]  # keep braces/parens etc
+    append = tokens.append
+    for ident, num, punct in RE_TOKEN.findall(code_norm):
+        if ident:
+            append(ident if ident in KEEP_IDENTS else "ID")
+        elif num:
+            # numbers already normalized to NUM, but keep any leftover digits
+            append("NUM")
+        else:
+            # operators/punct (single char; enough for similarity)
+            append(punct)
     return tokens
 
 
@@ -201,13 +208,39 @@ def stable_hash_int(s: str) -> int:
     return int.from_bytes(h, "big", signed=False)
 
 
+# Rolling (Rabin-Karp) hash over token ids: mod a Mersenne prime, fixed base.
+HASH_MOD = (1 << 61) - 1
+HASH_BASE = 1315423911
+
+# token -> stable id; the normalized vocabulary is tiny, so this stays small
+_TOK_ID: Dict[str, int] = {}
+
+
+def token_id(tok: str) -> int:
+    tid = _TOK_ID.get(tok)
+    if tid is None:
+        tid = _TOK_ID[tok] = stable_hash_int(tok) % HASH_MOD
+    return tid
+
+
 def kgram_hashes(tokens: List[str], k: int) -> List[int]:
-    if len(tokens) < k:
+    """
+    Polynomial hash of every k-gram, computed in O(n) by sliding the window
+    instead of hashing each joined k-gram from scratch.
+    """
+    if k < 1 or len(tokens) < k:
         return []
-    out = []
-    for i in range(len(tokens) - k + 1):
-        gram = " ".join(tokens[i : i + k])
-        out.append(stable_hash_int(gram))
+    ids = [_TOK_ID[t] if t in _TOK_ID else token_id(t) for t in tokens]
+
+    h = 0
+    for x in ids[:k]:
+        h = (h * HASH_BASE + x) % HASH_MOD
+    out = [h]
+
+    top = pow(HASH_BASE, k - 1, HASH_MOD)  # weight of the outgoing token
+    for i in range(len(ids) - k):
+        h = ((h - ids[i] * top) * HASH_BASE + ids[i + k]) % HASH_MOD
+        out.append(h)
     return out
 
 
@@ -221,19 +254,16 @@ def winnow(hashes: List[int], window: int) -> Set[int]:
         return set(hashes)
 
     selected: Set[int] = set()
-    dq = deque()  # (hash, idx)
-
-    for i, hv in enumerate(hashes):
-        # pop bigger hashes from the right
-        while dq and dq[-1][0] >= hv:
-            dq.pop()
-        dq.append((hv, i))
-        # drop left elements outside window
-        while dq and dq[0][1] <= i - window:
-            dq.popleft()
-        # start selecting once we have a full window
-        if i >= window - 1 and dq:
-            selected.add(dq[0][0])
+    mi = -1  # index of the current window minimum
+    for start in range(len(hashes) - window + 1):
+        end = start + window - 1
+        if mi < start:
+            # minimum slid out: rescan the window with C-level min/index
+            win = hashes[start : end + 1]
+            mi = end - win[::-1].index(min(win))
+        elif hashes[end] <= hashes[mi]:
+            mi = end
+        selected.add(hashes[mi])
     return selected
 
 
@@ -242,49 +272,69 @@ def fingerprints_for_tokens(tokens: List[str], k: int, w: int) -> Set[int]:
     return winnow(hs, w)
 
 
-def jaccard(a: Set[int], b: Set[int]) -> float:
-    if not a or not b:
-        return 0.0
-    inter = len(a & b)
-    if inter == 0:
-        return 0.0
-    uni = len(a | b)
-    return inter / uni if uni else 0.0
-
-
 # ----------------------------
 # Block extraction (heuristic)
 # ----------------------------
 
-RE_GO_FUNC = re.compile(
-    r"^\s*func\s+(\([^\)]*\)\s*)?([A-Za-z_][A-Za-z0-9_]*)\s*\(", re.M
+_NAME = rb"[A-Za-z_][A-Za-z0-9_]*"
+
+# One pattern per language: a single finditer pass finds every block start,
+# and the named group that matched (m.lastgroup) says what kind it is.
+# Patterns are bytes: files are scanned undecoded (see read_bytes).
+RE_GO_BLOCK = re.compile(
+    rb"^\s*(?:func\s+(?:\([^\)]*\)\s*)?(?P<go_func>%s)\s*\("
+    rb"|type\s+(?P<go_type>%s)\s+(?:struct|interface)\b)" % (_NAME, _NAME),
+    re.M,
 )
-RE_GO_TYPE = re.compile(
-    r"^\s*type\s+([A-Za-z_][A-Za-z0-9_]*)\s+(struct|interface)\b", re.M
+RE_JS_BLOCK = re.compile(
+    rb"^\s*(?:export\s+)?(?:(?:async\s+)?function\s+(?P<js_func>%s)\s*\("
+    rb"|class\s+(?P<js_class>%s)\b"
+    rb"|(?:const|let|var)\s+(?P<js_arrow>%s)\s*=\s*(?:async\s*)?\()"
+    % (_NAME, _NAME, _NAME),
+    re.M,
 )
-
-RE_JS_FUNC = re.compile(
-    r"^\s*(export\s+)?(async\s+)?function\s+([A-Za-z_][A-Za-z0-9_]*)\s*\(", re.M
+RE_PY_BLOCK = re.compile(
+    rb"^\s*(?:def\s+(?P<py_def>%s)\s*\(|class\s+(?P<py_class>%s)\b)"
+    % (_NAME, _NAME),
+    re.M,
 )
-RE_JS_CLASS = re.compile(r"^\s*(export\s+)?class\s+([A-Za-z_][A-Za-z0-9_]*)\b", re.M)
-RE_JS_ARROW = re.compile(
-    r"^\s*(export\s+)?(const|let|var)\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(async\s*)?\(",
+RE_RB_BLOCK = re.compile(
+    rb"^\s*(?:def\s+(?P<rb_def>[A-Za-z_][A-Za-z0-9_!?=]*)"
+    rb"|class\s+(?P<rb_class>[A-Za-z_][A-Za-z0-9_:]*))",
     re.M,
 )
 
-RE_PY_DEF = re.compile(r"^\s*def\s+([A-Za-z_][A-Za-z0-9_]*)\s*\(", re.M)
-RE_PY_CLASS = re.compile(r"^\s*class\s+([A-Za-z_][A-Za-z0-9_]*)\b", re.M)
+LANG_BLOCK_RE = {
+    "go": RE_GO_BLOCK,
+    "js": RE_JS_BLOCK,
+    "ts": RE_JS_BLOCK,
+    "jsx": RE_JS_BLOCK,
+    "tsx": RE_JS_BLOCK,
+    "py": RE_PY_BLOCK,
+    "rb": RE_RB_BLOCK,
+}
 
-RE_RB_DEF = re.compile(r"^\s*def\s+([A-Za-z_][A-Za-z0-9_!?=]*)", re.M)
-RE_RB_CLASS = re.compile(r"^\s*class\s+([A-Za-z_][A-Za-z0-9_:]*)", re.M)
+BLOCK_KINDS = {
+    "go_func": "function",
+    "go_type": "type",
+    "js_func": "function",
+    "js_class": "class",
+    "js_arrow": "function",
+    "py_def": "function",
+    "py_class": "class",
+    "rb_def": "function",
+    "rb_class": "class",
+}
 
 
-def find_matching_blocks(code: str, lang: str) -> List[Tuple[int, int, str, str]]:
+def find_matching_blocks(
+    code: bytes, lang: str, lines: List[bytes]
+) -> List[Tuple[int, int, str, str]]:
     """
     Returns list of (start_line, end_line, kind, name) line numbers are 1-based.
     Heuristic braces for C-like; indentation for Python/Ruby.
+    Works on raw (undecoded) file bytes; `lines` is code.splitlines().
     """
-    lines = code.splitlines()
     n = len(lines)
 
     def brace_block_from_line(start_idx: int) -> Optional[int]:
@@ -293,63 +343,48 @@ def find_matching_blocks(code: str, lang: str) -> List[Tuple[int, int, str, str]
         started = False
         for i in range(start_idx, n):
             ln = lines[i]
-            # count braces
-            for ch in ln:
-                if ch == "{":
-                    brace += 1
-                    started = True
-                elif ch == "}":
-                    brace -= 1
+            # count braces (only the per-line balance matters)
+            opened = ln.count(b"{")
+            if opened:
+                started = True
+            brace += opened - ln.count(b"}")
             if started and brace <= 0:
                 return i
         return None
 
     def indent_block_from_line(start_idx: int) -> int:
         # Python/Ruby-ish: block ends when indentation decreases (very heuristic)
-        base = len(lines[start_idx]) - len(lines[start_idx].lstrip(" "))
+        base = len(lines[start_idx]) - len(lines[start_idx].lstrip(b" "))
         end = start_idx
         for i in range(start_idx + 1, n):
             ln = lines[i]
             if not ln.strip():
                 end = i
                 continue
-            ind = len(ln) - len(ln.lstrip(" "))
-            if ind <= base and not ln.lstrip().startswith(("#",)):
+            ind = len(ln) - len(ln.lstrip(b" "))
+            if ind <= base and not ln.lstrip().startswith(b"#"):
                 break
             end = i
         return end
 
     matches: List[Tuple[int, int, str, str]] = []
 
-    def add_matches(regex: re.Pattern, kind: str, name_group: int):
+    regex = LANG_BLOCK_RE.get(lang)
+    if regex is not None:  # fallback: no matches
+        # matches come in order, so count newlines incrementally
+        start_idx, pos = 0, 0
         for m in regex.finditer(code):
-            start_line = code[: m.start()].count("\n") + 1
-            start_idx = start_line - 1
-            name = m.group(name_group) if name_group <= m.lastindex else "unknown"
+            start_idx += code.count(b"\n", pos, m.start())
+            pos = m.start()
             if lang in {"py", "rb"}:
                 end_idx = indent_block_from_line(start_idx)
             else:
                 end_idx = brace_block_from_line(start_idx)
                 if end_idx is None:
                     continue
-            matches.append((start_idx + 1, end_idx + 1, kind, name))
-
-    if lang == "go":
-        add_matches(RE_GO_FUNC, "function", 2)
-        add_matches(RE_GO_TYPE, "type", 1)
-    elif lang in {"js", "ts", "jsx", "tsx"}:
-        add_matches(RE_JS_FUNC, "function", 3)
-        add_matches(RE_JS_CLASS, "class", 2)
-        add_matches(RE_JS_ARROW, "function", 3)
-    elif lang == "py":
-        add_matches(RE_PY_DEF, "function", 1)
-        add_matches(RE_PY_CLASS, "class", 1)
-    elif lang == "rb":
-        add_matches(RE_RB_DEF, "function", 1)
-        add_matches(RE_RB_CLASS, "class", 1)
-    else:
-        # fallback: no matches
-        pass
+            group = m.lastgroup
+            name = m.group(group).decode("ascii")
+            matches.append((start_idx + 1, end_idx + 1, BLOCK_KINDS[group], name))
 
     # dedupe overlaps: keep larger blocks first
     matches.sort(key=lambda x: (x[0], -(x[1] - x[0])))
@@ -363,9 +398,8 @@ def find_matching_blocks(code: str, lang: str) -> List[Tuple[int, int, str, str]
 
 
 def make_windows(
-    code: str, win_lines: int, step: int
+    lines: List[bytes], win_lines: int, step: int
 ) -> List[Tuple[int, int, str, str]]:
-    lines = code.splitlines()
     n = len(lines)
     out = []
     if win_lines <= 0 or win_lines > n:
@@ -383,69 +417,90 @@ def make_windows(
 
 def iter_files(
     root: Path, langs: Set[str], max_file_kb: int, exclude_dirs: Set[str]
-) -> Iterable[Path]:
-    for dirpath, dirnames, filenames in os.walk(root):
-        # prune excluded dirs
-        dirnames[:] = [
-            d for d in dirnames if d not in exclude_dirs and not d.startswith(".")
-        ]
-        for fn in filenames:
-            p = Path(dirpath) / fn
-            ext = p.suffix.lower()
-            if ext not in EXT_LANG:
-                continue
-            lang = EXT_LANG[ext]
-            if langs and lang not in langs:
-                continue
-            try:
-                if p.stat().st_size > max_file_kb * 1024:
+) -> Iterable[str]:
+    """
+    Walk with os.scandir directly: entry type comes from the directory
+    listing, names/paths are plain strings (no Path per file).
+    """
+    max_bytes = max_file_kb * 1024
+    skip = frozenset(exclude_dirs)
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                name = e.name
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        # prune excluded dirs
+                        if name not in skip and not name.startswith("."):
+                            stack.append(e.path)
+                        continue
+                    if not e.is_file():
+                        continue
+                    lang = EXT_LANG.get(os.path.splitext(name)[1].lower())
+                    if lang is None or (langs and lang not in langs):
+                        continue
+                    if e.stat().st_size > max_bytes:
+                        continue
+                except OSError:
                     continue
-            except OSError:
-                continue
-            yield p
+                yield e.path
 
 
-def read_text(p: Path) -> str:
+def read_bytes(p: str) -> bytes:
+    # block detection runs on raw bytes; only extracted block texts get decoded
     try:
-        return p.read_text(encoding="utf-8", errors="replace")
+        with open(p, "rb") as f:
+            return f.read()
     except Exception:
-        return ""
+        return b""
+
 
+def decode_lines(lines: List[bytes]) -> str:
+    return b"\n".join(lines).decode("utf-8", errors="replace")
 
-def build_blocks(
+
+def file_blocks(
+    fp: str,
     root: Path,
-    langs: Set[str],
     mode: str,
     win_lines: int,
     win_step: int,
     min_block_lines: int,
-    max_file_kb: int,
-    exclude_dirs: Set[str],
 ) -> List[Tuple[BlockRef, str]]:
     blocks: List[Tuple[BlockRef, str]] = []
-    for fp in iter_files(root, langs, max_file_kb, exclude_dirs):
-        code = read_text(fp)
-        if not code.strip():
-            continue
-        ext_lang = EXT_LANG.get(fp.suffix.lower(), "unknown")
+    code = read_bytes(fp)
+    if not code.strip():
+        return blocks
+    ext_lang = EXT_LANG.get(os.path.splitext(fp)[1].lower(), "unknown")
+
+    file_rel = os.path.relpath(fp, root)
+    lines = code.splitlines()  # once per file; every block slices it
+
+    if mode in {"blocks", "both"}:
+        found = find_matching_blocks(code, ext_lang, lines)
+        for s, e, kind, name in found:
+            if e - s + 1 < min_block_lines:
+                continue
+            text = decode_lines(lines[s - 1 : e])
+            blocks.append((BlockRef(file_rel, s, e, kind, name, ext_lang), text))
 
-        file_rel = str(fp.relative_to(root))
+    if mode in {"windows", "both"}:
+        wins = make_windows(lines, win_lines, win_step)
+        for s, e, kind, name in wins:
+            text = decode_lines(lines[s - 1 : e])
+            blocks.append((BlockRef(file_rel, s, e, kind, name, ext_lang), text))
 
-        if mode in {"blocks", "both"}:
-            found = find_matching_blocks(code, ext_lang)
-            for s, e, kind, name in found:
-                if e - s + 1 < min_block_lines:
-                    continue
-                text = "\n".join(code.splitlines()[s - 1 : e])
-                blocks.append((BlockRef(file_rel, s, e, kind, name, ext_lang), text))
+    return blocks
 
-        if mode in {"windows", "both"}:
-            wins = make_windows(code, win_lines, win_step)
-            for s, e, kind, name in wins:
-                text = "\n".join(code.splitlines()[s - 1 : e])
-                blocks.append((BlockRef(file_rel, s, e, kind, name, ext_lang), text))
 
-    return blocks
+# (lang, text hash) -> (tokens, fingerprints) or None, for one scan: exact
+# duplicate blocks are normalized and fingerprinted once
+FpCache = Dict[Tuple[str, int], Optional[Tuple[List[str], Set[int]]]]
 
 
 def block_to_fingerprinted(
@@ -454,15 +509,83 @@ def block_to_fingerprinted(
     k: int,
     w: int,
     min_tokens: int,
+    fp_cache: FpCache,
 ) -> Optional[Block]:
-    norm = normalize_code(text, bref.lang)
-    toks = tokenize(norm)
-    if len(toks) < min_tokens:
-        return None
-    fps = fingerprints_for_tokens(toks, k, w)
-    if not fps:
+    th = stable_hash_int(text)
+    key = (bref.lang, th)
+    if key in fp_cache:
+        hit = fp_cache[key]
+    else:
+        hit = None
+        toks = tokenize(normalize_code(text, bref.lang))
+        if len(toks) >= min_tokens:
+            fps = fingerprints_for_tokens(toks, k, w)
+            if fps:
+                hit = (toks, fps)
+        fp_cache[key] = hit
+    if hit is None:
         return None
-    return Block(ref=bref, text=text, norm_tokens=toks, fingerprints=fps)
+    # duplicates share the token list and fingerprint set rather than copies
+    return Block(
+        ref=bref, text=text, norm_tokens=hit[0], fingerprints=hit[1], text_hash=th
+    )
+
+
+def process_file(
+    fp: str, cfg: ScanConfig, fp_cache: FpCache
+) -> Tuple[int, List[Block]]:
+    """
+    Extract and fingerprint one file. Returns (raw block count, indexed blocks).
+    """
+    raw = file_blocks(
+        fp, cfg.root, cfg.mode, cfg.win_lines, cfg.win_step, cfg.min_block_lines
+    )
+    blocks: List[Block] = []
+    for bref, text in raw:
+        b = block_to_fingerprinted(
+            bref, text, cfg.k, cfg.w, cfg.min_tokens, fp_cache
+        )
+        if b is not None:
+            blocks.append(b)
+    return len(raw), blocks
+
+
+def scan_files(
+    files: List[str], cfg: ScanConfig, jobs: int
+) -> List[Tuple[int, List[Block]]]:
+    """
+    Run process_file over all files, across worker processes when jobs != 1.
+    Results keep the order of `files`, so the output stays deterministic.
+    """
+    chunksize = 16
+    if jobs == 1 or len(files) <= chunksize:
+        fp_cache: FpCache = {}
+        return [process_file(fp, cfg, fp_cache) for fp in files]
+    with ProcessPoolExecutor(
+        max_workers=jobs or None, initializer=_init_worker_cache
+    ) as ex:
+        return list(
+            ex.map(
+                _process_file_in_worker,
+                files,
+                itertools.repeat(cfg),
+                chunksize=chunksize,
+            )
+        )
+
+
+# Each pool worker's dedup cache; created by the initializer and gone with the
+# worker, so it never outlives the scan (the parent process never sets it)
+_WORKER_FP_CACHE: Optional[FpCache] = None
+
+
+def _init_worker_cache() -> None:
+    global _WORKER_FP_CACHE
+    _WORKER_FP_CACHE = {}
+
+
+def _process_file_in_worker(fp: str, cfg: ScanConfig) -> Tuple[int, List[Block]]:
+    return process_file(fp, cfg, _WORKER_FP_CACHE)
 
 
 # ----------------------------
@@ -470,29 +593,174 @@ def block_to_fingerprinted(
 # ----------------------------
 
 
-def union_find(n: int):
-    parent = list(range(n))
-    rank = [0] * n
+class DSU:
+    """Union-find with path halving and union by rank over flat int arrays."""
+
+    __slots__ = ("parent", "rank")
 
-    def find(x: int) -> int:
+    def __init__(self, n: int):
+        self.parent = array("i", range(n))
+        # rank never exceeds log2(n), so a signed byte is plenty
+        self.rank = array("b", bytes(n))
+
+    def find(self, x: int) -> int:
+        parent = self.parent
         while parent[x] != x:
             parent[x] = parent[parent[x]]
             x = parent[x]
         return x
 
-    def union(a: int, b: int):
-        ra, rb = find(a), find(b)
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
         if ra == rb:
             return
+        rank = self.rank
         if rank[ra] < rank[rb]:
-            parent[ra] = rb
+            self.parent[ra] = rb
         elif rank[ra] > rank[rb]:
-            parent[rb] = ra
+            self.parent[rb] = ra
         else:
-            parent[rb] = ra
+            self.parent[rb] = ra
             rank[ra] += 1
 
-    return find, union, parent
+
+def prune_stop_grams(blocks: List[Block], max_df: int) -> int:
+    """
+    Stop-gram filtering: drop fingerprints that occur in more than max_df
+    blocks (boilerplate like imports/license headers). They add little to
+    similarity but blow up posting lists. Returns how many were dropped.
+    """
+    df = Counter(fp for b in blocks for fp in b.fingerprints)
+    stop = {fp for fp, n in df.items() if n > max_df}
+    if stop:
+        for b in blocks:
+            if not b.fingerprints.isdisjoint(stop):
+                b.fingerprints = b.fingerprints - stop
+    return len(stop)
+
+
+def index_overlaps(
+    blocks: List[Block], min_shared_fps: int
+) -> Iterable[List[Tuple[int, int]]]:
+    """
+    Inverted index (fingerprint -> block indices). Yields, per block, the
+    (index, shared fingerprint count) of every block that may share at
+    least min_shared_fps fingerprints with it.
+    """
+    # compact int32 posting lists instead of lists of int objects
+    inv: Dict[int, array] = defaultdict(lambda: array("i"))
+    for i, b in enumerate(blocks):
+        for fp in b.fingerprints:
+            inv[fp].append(i)
+
+    # scratch counters reused across blocks; `touched` says what to reset
+    shared = array("i", [0]) * len(blocks)
+    for i, b in enumerate(blocks):
+        touched: List[int] = []
+        # Prefix filtering: walk the rarest fingerprints first. Once fewer
+        # than min_shared_fps remain, a block not seen yet can't reach the
+        # threshold, so only already-touched blocks keep counting.
+        fps = sorted(b.fingerprints, key=lambda fp: len(inv[fp]))
+        last_open = len(fps) - min_shared_fps
+        for pos, fp in enumerate(fps):
+            admit = pos <= last_open
+            for j in inv[fp]:
+                c = shared[j]
+                if c:
+                    shared[j] = c + 1
+                elif admit and j != i:
+                    shared[j] = 1
+                    touched.append(j)
+        counts = [(j, shared[j]) for j in touched]
+        for j in touched:
+            shared[j] = 0
+        yield counts
+
+
+# MinHash slot mixing (fingerprints are re-hashed before binning)
+MIX_A = 0x5851F42D4C957F2D % HASH_MOD
+MIX_B = 0x14057B7EF767814F % HASH_MOD
+
+
+def minhash_signature(fps: Set[int], num_perm: int) -> Tuple[int, ...]:
+    """
+    One-permutation MinHash: every fingerprint is hashed once into one of
+    num_perm bins and each bin keeps its minimum. Empty bins borrow from the
+    next non-empty bin to the right (densification by rotation), offset by
+    the distance so borrowed values don't collide with real ones.
+    """
+    span = HASH_MOD // num_perm + 1
+    bins: List[Optional[int]] = [None] * num_perm
+    for fp in fps:
+        h = (fp * MIX_A + MIX_B) % HASH_MOD
+        k, v = h % num_perm, h // num_perm
+        cur = bins[k]
+        if cur is None or v < cur:
+            bins[k] = v
+
+    sig = list(bins)
+    for k in range(num_perm):
+        if bins[k] is not None:
+            continue
+        for d in range(1, num_perm):
+            v = bins[(k + d) % num_perm]
+            if v is not None:
+                sig[k] = v + d * span
+                break
+    return tuple(sig)
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) with bands*rows <= num_perm minimizing the area of
+    false positives below `threshold` plus false negatives above it.
+    """
+    steps = 100
+
+    def area(lo: float, hi: float, f) -> float:
+        dx = (hi - lo) / steps
+        return sum(f(lo + (i + 0.5) * dx) for i in range(steps)) * dx
+
+    best = (1, num_perm)
+    best_err = float("inf")
+    for b in range(1, num_perm + 1):
+        r = num_perm // b
+        fp = area(0.0, threshold, lambda s: 1 - (1 - s**r) ** b)
+        fn = area(threshold, 1.0, lambda s: (1 - s**r) ** b)
+        if fp + fn < best_err:
+            best, best_err = (b, r), fp + fn
+    return best
+
+
+def lsh_overlaps(
+    blocks: List[Block], min_jaccard: float, num_perm: int
+) -> Iterable[List[Tuple[int, int]]]:
+    """
+    Banded LSH over MinHash signatures: only blocks that land in the same
+    bucket for at least one band become candidates, and only those pairs
+    get an exact fingerprint intersection. Same output shape as
+    index_overlaps.
+    """
+    bands, rows = lsh_params(min_jaccard, num_perm)
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+    for i, b in enumerate(blocks):
+        if not b.fingerprints:
+            continue
+        sig = minhash_signature(b.fingerprints, num_perm)
+        for band in range(bands):
+            buckets[(band, sig[band * rows : (band + 1) * rows])].append(i)
+
+    neighbors: List[Set[int]] = [set() for _ in blocks]
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for i in members:
+            neighbors[i].update(members)
+
+    for i, b in enumerate(blocks):
+        near = neighbors[i]
+        near.discard(i)
+        yield [(j, len(b.fingerprints & blocks[j].fingerprints)) for j in near]
 
 
 def cluster_blocks(
@@ -500,48 +768,65 @@ def cluster_blocks(
     min_jaccard: float,
     min_shared_fps: int,
     topk_per_block: int,
+    lsh_perm: int = 0,
 ) -> Tuple[List[List[int]], Dict[Tuple[int, int], float]]:
     """
     Deterministic clustering:
-    - Build inverted index: fingerprint -> block indices
-    - For each block, count overlaps with candidates
-    - Compute Jaccard for top candidates; union if threshold
+    - Count shared fingerprints per candidate pair, via an inverted index
+      (default) or MinHash LSH buckets (lsh_perm > 0)
+    - Jaccard of top candidates follows from the overlap count; union if threshold
     """
-    inv: Dict[int, List[int]] = defaultdict(list)
-    for i, b in enumerate(blocks):
-        for fp in b.fingerprints:
-            inv[fp].append(i)
+    if lsh_perm > 0:
+        overlaps = lsh_overlaps(blocks, min_jaccard, lsh_perm)
+    else:
+        overlaps = index_overlaps(blocks, min_shared_fps)
 
-    # overlap counting
     pair_scores: Dict[Tuple[int, int], float] = {}
-    find, union, _parent = union_find(len(blocks))
+    dsu = DSU(len(blocks))
+    fp_len = [len(b.fingerprints) for b in blocks]
 
+    # exact duplicates have identical fingerprints (Jaccard 1.0): union them
+    # with the first copy up front instead of relying on the top-k shortlist
+    # (still subject to min_shared_fps, like any other candidate pair)
+    first_copy: Dict[Tuple[str, int], int] = {}
     for i, b in enumerate(blocks):
-        counts: Dict[int, int] = defaultdict(int)
-        for fp in b.fingerprints:
-            for j in inv.get(fp, []):
-                if j == i:
-                    continue
-                counts[j] += 1
-
-        # shortlist by shared fps (descending), deterministic tie-break by index
-        cand = [(j, c) for j, c in counts.items() if c >= min_shared_fps]
-        cand.sort(key=lambda x: (-x[1], x[0]))
-        cand = cand[: max(0, topk_per_block)]
+        if fp_len[i] < max(1, min_shared_fps):
+            continue
+        rep = first_copy.setdefault((b.ref.lang, b.text_hash), i)
+        if rep != i:
+            pair_scores[(rep, i)] = 1.0
+            dsu.union(rep, i)
+
+    for i, counts in enumerate(overlaps):
+        # shortlist by shared fps (descending), deterministic tie-break by index;
+        # Jaccard can't exceed min(|A|,|B|)/max(|A|,|B|), so skip pairs whose
+        # sizes alone rule them out
+        la = fp_len[i]
+        cand = heapq.nlargest(
+            max(0, topk_per_block),
+            (
+                (j, c)
+                for j, c in counts
+                if c >= min_shared_fps
+                and min(la, fp_len[j]) / max(la, fp_len[j]) >= min_jaccard
+            ),
+            key=lambda x: (x[1], -x[0]),
+        )
 
         for j, shared in cand:
             a, c = (i, j) if i < j else (j, i)
             if (a, c) in pair_scores:
                 continue
-            sim = jaccard(blocks[a].fingerprints, blocks[c].fingerprints)
+            # fingerprints are sets, so the overlap count is the exact |A n B|
+            sim = shared / (fp_len[a] + fp_len[c] - shared)
             if sim >= min_jaccard:
                 pair_scores[(a, c)] = sim
-                union(a, c)
+                dsu.union(a, c)
 
     # collect clusters
     buckets: Dict[int, List[int]] = defaultdict(list)
     for i in range(len(blocks)):
-        buckets[find(i)].append(i)
+        buckets[dsu.find(i)].append(i)
 
     clusters = [sorted(v) for v in buckets.values() if len(v) >= 2]
     # stable ordering: bigger clusters first, then by first index
@@ -565,10 +850,26 @@ def bref_to_dict(b: BlockRef) -> dict:
     }
 
 
+def edges_by_cluster(
+    clusters: List[List[int]],
+    pair_scores: Dict[Tuple[int, int], float],
+) -> List[List[Tuple[float, int, int]]]:
+    # every kept pair was unioned, so both ends share a cluster; one pass over
+    # the edges beats probing all size^2 member pairs per cluster
+    cluster_of: Dict[int, int] = {}
+    for ci, cl in enumerate(clusters):
+        for idx in cl:
+            cluster_of[idx] = ci
+    edges: List[List[Tuple[float, int, int]]] = [[] for _ in clusters]
+    for (a, b), sim in pair_scores.items():
+        edges[cluster_of[a]].append((sim, a, b))
+    return edges
+
+
 def render_text_report(
     blocks: List[Block],
     clusters: List[List[int]],
-    pair_scores: Dict[Tuple[int, int], float],
+    cluster_edges: List[List[Tuple[float, int, int]]],
     max_clusters: int,
 ) -> str:
     out = []
@@ -583,16 +884,7 @@ def render_text_report(
                 f"- [{idx}] {r.lang} {r.kind} {r.name} :: {r.file}:{r.start_line}-{r.end_line}"
             )
         # show a few pair scores
-        best_pairs = []
-        for a in cl:
-            for b in cl:
-                if a >= b:
-                    continue
-                key = (a, b)
-                if key in pair_scores:
-                    best_pairs.append((pair_scores[key], a, b))
-        best_pairs.sort(reverse=True)
-        for sim, a, b in best_pairs[:5]:
+        for sim, a, b in heapq.nlargest(5, cluster_edges[ci - 1]):
             out.append(f"  sim={sim:.3f}  [{a}] <-> [{b}]")
         out.append("")
     return "\n".join(out)
@@ -603,7 +895,7 @@ def render_text_report(
 # ----------------------------
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     ap = argparse.ArgumentParser()
     ap.add_argument("--root", default=".", help="Repository root")
     ap.add_argument(
@@ -658,6 +950,20 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument(
         "--topk", type=int, default=50, help="Max candidate comparisons per block"
     )
+    ap.add_argument(
+        "--max-df",
+        type=int,
+        default=0,
+        help="Drop fingerprints found in more blocks than this (0=off)",
+    )
+    ap.add_argument(
+        "--use-lsh",
+        action="store_true",
+        help="Generate candidates with MinHash LSH instead of the inverted index",
+    )
+    ap.add_argument(
+        "--lsh-perm", type=int, default=128, help="MinHash signature length (LSH)"
+    )
 
     ap.add_argument(
         "--max-clusters",
@@ -665,13 +971,22 @@ def parse_args() -> argparse.Namespace:
         default=50,
         help="Max clusters to show in text report",
     )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Worker processes for parsing/fingerprinting (0=all cores, 1=serial)",
+    )
     ap.add_argument("--out", default="clones.json", help="Output JSON file path")
     ap.add_argument("--report", default="clones.txt", help="Output text report path")
-    return ap.parse_args()
+    args = ap.parse_args(argv)
+    if args.jobs < 0:
+        ap.error("--jobs must be >= 0")
+    return args
 
 
-def main():
-    args = parse_args()
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
     root = Path(args.root).resolve()
 
     langs = (
@@ -681,35 +996,41 @@ def main():
     )
     exclude_dirs = set([s.strip() for s in args.exclude_dirs.split(",") if s.strip()])
 
-    raw_blocks = build_blocks(
+    cfg = ScanConfig(
         root=root,
-        langs=langs,
         mode=args.mode,
         win_lines=args.win_lines,
         win_step=args.win_step,
         min_block_lines=args.min_block_lines,
-        max_file_kb=args.max_file_kb,
-        exclude_dirs=exclude_dirs,
+        k=args.k,
+        w=args.w,
+        min_tokens=args.min_tokens,
     )
+    files = sorted(iter_files(root, langs, args.max_file_kb, exclude_dirs))
 
+    raw_blocks = 0
     blocks: List[Block] = []
-    for bref, text in raw_blocks:
-        b = block_to_fingerprinted(
-            bref, text, k=args.k, w=args.w, min_tokens=args.min_tokens
-        )
-        if b is not None:
-            blocks.append(b)
+    for n_raw, found in scan_files(files, cfg, args.jobs):
+        raw_blocks += n_raw
+        blocks.extend(found)
+
+    stop_grams = prune_stop_grams(blocks, args.max_df) if args.max_df > 0 else 0
+    # blocks left with too few fingerprints can't pair with anything
+    starved = sum(1 for b in blocks if len(b.fingerprints) < args.min_shared_fps)
 
     clusters, pair_scores = cluster_blocks(
         blocks=blocks,
         min_jaccard=args.min_jaccard,
         min_shared_fps=args.min_shared_fps,
         topk_per_block=args.topk,
+        lsh_perm=args.lsh_perm if args.use_lsh else 0,
     )
 
+    cluster_edges = edges_by_cluster(clusters, pair_scores)
+
     # Build JSON
     clusters_json = []
-    for cl in clusters:
+    for ci, cl in enumerate(clusters):
         members = []
         for idx in cl:
             members.append(
@@ -721,14 +1042,7 @@ def main():
                 }
             )
         # include best pair similarity in the cluster (for quick ranking)
-        best = 0.0
-        for a in cl:
-            for b in cl:
-                if a >= b:
-                    continue
-                sim = pair_scores.get((a, b), 0.0)
-                if sim > best:
-                    best = sim
+        best = max((e[0] for e in cluster_edges[ci]), default=0.0)
         clusters_json.append(
             {
                 "size": len(cl),
@@ -748,22 +1062,33 @@ def main():
             "min_jaccard": args.min_jaccard,
             "min_shared_fps": args.min_shared_fps,
             "topk": args.topk,
+            "max_df": args.max_df,
+            "lsh_perm": args.lsh_perm if args.use_lsh else 0,
             "min_block_lines": args.min_block_lines,
             "win_lines": args.win_lines,
             "win_step": args.win_step,
             "max_file_kb": args.max_file_kb,
         },
         "stats": {
-            "raw_blocks": len(raw_blocks),
+            "raw_blocks": raw_blocks,
             "indexed_blocks": len(blocks),
+            "stop_grams": stop_grams,
+            "blocks_below_min_shared_fps": starved,
             "clusters": len(clusters),
             "pairs_kept": len(pair_scores),
         },
         "clusters": clusters_json,
     }
 
-    Path(args.out).write_text(json.dumps(out_obj, indent=2), encoding="utf-8")
-    report = render_text_report(blocks, clusters, pair_scores, args.max_clusters)
+    if orjson is not None:
+        Path(args.out).write_bytes(orjson.dumps(out_obj, option=orjson.OPT_INDENT_2))
+    else:
+        # compact separators keep the stdlib on its C encoder; indent= forces
+        # the pure-Python one
+        Path(args.out).write_text(
+            json.dumps(out_obj, separators=(",", ":")), encoding="utf-8"
+        )
+    report = render_text_report(blocks, clusters, cluster_edges, args.max_clusters)
     Path(args.report).write_text(report, encoding="utf-8")
 
     print(f"Wrote: {args.out}")
@@ -106,7 +106,7 @@ def list_emails(count, label):
         return f"Error accessing Gmail: {str(e)}"
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Gmail Inbox Tool for IRon")
     parser.add_argument(
         "--count", type=int, default=5, help="Number of emails to fetch"
@@ -114,6 +114,10 @@ if __name__ == "__main__":
     parser.add_argument(
         "--label", default="INBOX", help="Gmail label (e.g., INBOX, UNREAD, SENT)"
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     print(list_emails(args.count, args.label))
+
+
+if __name__ == "__main__":
+    main()
@@ -69,11 +69,15 @@ def read_email(msg_id):
         return f"Error reading email {msg_id}: {str(e)}"
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Gmail Message Reader Tool for IRon")
     parser.add_argument(
         "--message_id", required=True, help="The unique Gmail message ID"
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     print(read_email(args.message_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,54 @@
 #!/usr/bin/env python3
 import argparse
+import http.client
 import os
+import tempfile
+import time
+import urllib.request
 from datetime import datetime
+from pathlib import Path
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import DISCOVERY_URI, build, build_from_document
 
 # ToolSchema: {"description": "List upcoming events from Google Calendar.", "parameters": {"type": "object", "properties": {"count": {"type": "integer", "description": "Number of events to fetch", "default": 10}}}}
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ["https://www.googleapis.com/auth/calendar.readonly"]
 
+# Credentials and the built service, reused across calls in the same process.
+_CREDS_CACHE = {"creds": None, "service": None}
+
+# Discovery document cached on disk for clients without a bundled (static)
+# copy, so later runs can build the service offline.
+DISCOVERY_CACHE = Path.home() / ".cache" / "iron" / "calendar-v3.json"
+DISCOVERY_TTL = 7 * 24 * 3600
+
+
+def save_token(new_json):
+    """
+    Writes token.json only if its content changed, via a private temp file
+    renamed into place so a crash can't leave a truncated token behind.
+    """
+    try:
+        with open("token.json") as token:
+            if token.read() == new_json:
+                return
+    except OSError:
+        pass
+
+    fd, tmp = tempfile.mkstemp(dir=".", prefix="token.", suffix=".json.tmp")
+    try:
+        with os.fdopen(fd, "w") as token:
+            token.write(new_json)
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, "token.json")
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
 
 def get_creds():
     """
@@ -20,6 +56,14 @@ def get_creds():
     Expects 'credentials.json' in the root directory.
     Saves/loads user tokens in 'token.json'.
     """
+    creds = _CREDS_CACHE["creds"]
+    if creds is not None and creds.valid:
+        # reuse unless the token expires within the next minute
+        if creds.expiry is None:
+            return creds
+        if (creds.expiry - datetime.utcnow()).total_seconds() > 60:
+            return creds
+
     creds = None
     if os.path.exists("token.json"):
         creds = Credentials.from_authorized_user_file("token.json", SCOPES)
@@ -40,18 +84,91 @@ def get_creds():
             flow = InstalledAppFlow.from_client_secrets_file("credentials.json", SCOPES)
             creds = flow.run_local_server(port=0)
 
-        with open("token.json", "w") as token:
-            token.write(creds.to_json())
+        save_token(creds.to_json())
+
+    # new credentials object: drop any service built on the old one
+    _CREDS_CACHE["creds"] = creds
+    _CREDS_CACHE["service"] = None
     return creds
 
 
+def load_discovery_doc():
+    """
+    Returns the cached Calendar v3 discovery document, or None if it is
+    missing or older than DISCOVERY_TTL.
+    """
+    try:
+        if time.time() - DISCOVERY_CACHE.stat().st_mtime < DISCOVERY_TTL:
+            return DISCOVERY_CACHE.read_text(encoding="utf-8")
+    except OSError:
+        pass
+    return None
+
+
+def fetch_discovery_doc():
+    """
+    Downloads the Calendar v3 discovery document and writes it to the cache.
+    Returns the document, or None if it could not be fetched; a failed cache
+    write is ignored, the next run just fetches again.
+    """
+    url = DISCOVERY_URI.format(api="calendar", apiVersion="v3")
+    try:
+        with urllib.request.urlopen(url, timeout=10) as resp:
+            doc = resp.read().decode("utf-8")
+    except (OSError, http.client.HTTPException, UnicodeDecodeError):
+        return None
+    try:
+        DISCOVERY_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        DISCOVERY_CACHE.write_text(doc, encoding="utf-8")
+    except OSError:
+        pass
+    return doc
+
+
+def build_static(creds):
+    """
+    Builds the service from the discovery document bundled with
+    google-api-python-client >= 2, without touching the network. Returns None
+    on older clients (no static_discovery) or when no bundled doc exists.
+    """
+    try:
+        return build(
+            "calendar",
+            "v3",
+            credentials=creds,
+            cache_discovery=False,
+            static_discovery=True,
+        )
+    except Exception:
+        return None
+
+
+def get_service():
+    creds = get_creds()
+    if _CREDS_CACHE["service"] is None:
+        doc = load_discovery_doc()
+        service = None
+        if doc is None:
+            service = build_static(creds)
+        if service is None:
+            doc = doc or fetch_discovery_doc()
+            if doc is not None:
+                service = build_from_document(doc, credentials=creds)
+            else:
+                # offline: fall back to the library's own discovery handling
+                service = build(
+                    "calendar", "v3", credentials=creds, cache_discovery=False
+                )
+        _CREDS_CACHE["service"] = service
+    return _CREDS_CACHE["service"]
+
+
 def list_events(count):
     """
     Lists the next 'count' events from the user's primary calendar.
     """
     try:
-        creds = get_creds()
-        service = build("calendar", "v3", credentials=creds)
+        service = get_service()
 
         # 'Z' indicates UTC time
         now = datetime.utcnow().isoformat() + "Z"
@@ -91,11 +208,15 @@ def list_events(count):
         return f"Error accessing Google Calendar: {str(e)}"
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Google Calendar Tool for IRon")
     parser.add_argument(
         "--count", type=int, default=10, help="Number of events to fetch"
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     print(list_events(args.count))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 import argparse
+import codecs
+import shutil
 import socket
 import subprocess
 import urllib.error
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 
-# ToolSchema: {"description": "Network utilities: ping a host, check port status, or perform a simple HTTP GET request.", "parameters": {"type": "object", "properties": {"action": {"type": "string", "enum": ["ping", "port_check", "http_get"], "description": "Network action to perform"}, "target": {"type": "string", "description": "Hostname, IP, or URL"}, "port": {"type": "integer", "description": "Port number (for port_check)"}}, "required": ["action", "target"]}}
+from _http import open_url
+
+# ToolSchema: {"description": "Network utilities: ping a host, check port status, or perform a simple HTTP GET request.", "parameters": {"type": "object", "properties": {"action": {"type": "string", "enum": ["ping", "port_check", "http_get"], "description": "Network action to perform"}, "target": {"type": "string", "description": "Hostname, IP, or URL"}, "targets": {"type": "string", "description": "Comma-separated hosts to ping in one batch (for ping, instead of target)"}, "port": {"type": "integer", "description": "Port number (for port_check)"}}, "required": ["action"]}}
 
 
 def ping_host(target):
@@ -26,43 +30,99 @@ def ping_host(target):
         return f"Unexpected error during ping: {e}"
 
 
+def ping_hosts(targets):
+    """
+    Pings several hosts concurrently: one fping run if available, otherwise
+    ping_host on a small thread pool.
+    """
+    if shutil.which("fping"):
+        try:
+            # -q prints one summary line per host (on stderr); exit status is
+            # non-zero if any host is unreachable, so don't treat it as failure
+            result = subprocess.run(
+                ["fping", "-c", "4", "-q", *targets],
+                capture_output=True,
+                text=True,
+                timeout=15,
+            )
+            return result.stderr.strip() or result.stdout.strip() or "fping: no output"
+        except subprocess.TimeoutExpired:
+            return f"Ping of {len(targets)} hosts timed out after 15 seconds."
+        except Exception as e:
+            return f"Unexpected error during ping: {e}"
+
+    with ThreadPoolExecutor(max_workers=min(8, len(targets))) as ex:
+        outputs = list(ex.map(ping_host, targets))
+    return "\n\n".join(f"=== {t} ===\n{out}" for t, out in zip(targets, outputs))
+
+
+def resolve_tcp4(host, port):
+    """
+    IPv4 TCP address for host:port.
+    """
+    return socket.getaddrinfo(host, port, socket.AF_INET, socket.SOCK_STREAM)[0][4]
+
+
 def check_port(target, port):
     if not port:
         return "Error: Port number is required for port_check."
 
+    # Resolve first so a bad hostname fails fast, before any socket is created
+    try:
+        addr = resolve_tcp4(target, int(port))
+    except socket.gaierror as e:
+        return f"Hostname resolution failed for {target}: {e}"
+    except Exception as e:
+        return f"Error checking port {port} on {target}: {e}"
+
     try:
         # Create a socket and attempt to connect
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
             s.settimeout(3.0)  # 3 second timeout
-            result = s.connect_ex((target, int(port)))
+            result = s.connect_ex(addr)
             if result == 0:
                 return f"Port {port} on {target} is OPEN."
             else:
                 return f"Port {port} on {target} is CLOSED or FILTERED (Error code: {result})."
-    except socket.gaierror as e:
-        return f"Hostname resolution failed for {target}: {e}"
     except Exception as e:
         return f"Error checking port {port} on {target}: {e}"
 
 
+def read_text_prefix(response, limit):
+    """
+    Reads at most `limit` bytes and decodes them as UTF-8. A multi-byte
+    character cut at the limit is dropped rather than raising.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = []
+    total = 0
+    while total < limit:
+        chunk = response.read(min(2048, limit - total))
+        if not chunk:
+            return decoder.decode(b"".join(chunks), final=True)
+        chunks.append(chunk)
+        total += len(chunk)
+    return decoder.decode(b"".join(chunks))
+
+
 def http_get(url):
     if not url.startswith(("http://", "https://")):
         url = "http://" + url
 
     try:
-        req = urllib.request.Request(
-            url, headers={"User-Agent": "Mozilla/5.0 (compatible; IRonNetworkTool/1.0)"}
-        )
-        with urllib.request.urlopen(req, timeout=10) as response:
-            status = response.getcode()
+        with open_url(
+            url, {"User-Agent": "Mozilla/5.0 (compatible; IRonNetworkTool/1.0)"}
+        ) as response:
+            status = response.status
             content_type = response.headers.get("Content-Type", "unknown")
-            body = response.read()
 
             # Try to decode text content
             text_content = ""
             if "text" in content_type or "json" in content_type:
                 try:
-                    text_content = body.decode("utf-8")
+                    # 8 KiB always decodes to more than 2000 chars, so a body
+                    # cut here is truncated below anyway
+                    text_content = read_text_prefix(response, 8192)
                     # Truncate to avoid flooding context window
                     if len(text_content) > 2000:
                         text_content = (
@@ -71,7 +131,12 @@ def http_get(url):
                 except UnicodeDecodeError:
                     text_content = "[Binary or un-decodable data]"
             else:
-                text_content = f"[{len(body)} bytes of {content_type} data]"
+                # don't download binary payloads just to measure them
+                length = response.headers.get("Content-Length")
+                if length is not None:
+                    text_content = f"[{length} bytes of {content_type} data]"
+                else:
+                    text_content = f"[{content_type} data of unknown size]"
 
             return (
                 f"Status: {status} OK\nContent-Type: {content_type}\n\n{text_content}"
@@ -85,15 +150,27 @@ def http_get(url):
         return f"Unexpected error fetching {url}: {e}"
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Network Tools for IRon")
     parser.add_argument(
         "--action", choices=["ping", "port_check", "http_get"], required=True
     )
-    parser.add_argument("--target", required=True, help="Hostname, IP, or URL")
+    parser.add_argument("--target", help="Hostname, IP, or URL")
+    parser.add_argument(
+        "--targets", default="", help="Comma-separated hosts to ping in one batch"
+    )
     parser.add_argument("--port", type=int, help="Port number for port_check")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    if args.action == "ping" and targets:
+        if args.target:
+            targets.insert(0, args.target)
+        print(ping_hosts(targets))
+        return
+    if not args.target:
+        parser.error("--target is required")
 
     if args.action == "ping":
         print(ping_host(args.target))
@@ -101,3 +178,7 @@ if __name__ == "__main__":
         print(check_port(args.target, args.port))
     elif args.action == "http_get":
         print(http_get(args.target))
+
+
+if __name__ == "__main__":
+    main()
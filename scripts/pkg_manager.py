@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 import argparse
-import os
+import shutil
 import subprocess
 import sys
 
 # ToolSchema: {"description": "Manage software packages using pip (Python) or npm (Node.js).", "parameters": {"type": "object", "properties": {"manager": {"type": "string", "enum": ["pip", "npm"], "description": "Package manager to use"}, "action": {"type": "string", "enum": ["install", "uninstall", "list"], "description": "Action to perform"}, "package": {"type": "string", "description": "Name of the package (required for install/uninstall)"}}, "required": ["manager", "action"]}}
 
+# Resolved npm executable, looked up once per process
+_NPM_CMD = None
+
 
 def run_command(cmd_list):
     try:
@@ -28,37 +31,41 @@ def run_command(cmd_list):
 
 
 def handle_pip(action, package):
-    # Determine the correct pip executable
-    pip_cmd = "pip"
-    if sys.platform != "win32" and os.system("command -v pip3 >/dev/null 2>&1") == 0:
-        pip_cmd = "pip3"
+    # Run pip under this interpreter: no PATH lookup, and packages land in the
+    # same environment the tools run in
+    pip_cmd = [sys.executable, "-m", "pip"]
 
     if action == "list":
-        return run_command([pip_cmd, "list"])
+        return run_command(pip_cmd + ["list"])
 
     if not package:
         return "Error: 'package' parameter is required for install/uninstall."
 
     if action == "install":
-        return run_command([pip_cmd, "install", package])
+        return run_command(pip_cmd + ["install", package])
     elif action == "uninstall":
-        return run_command([pip_cmd, "uninstall", "-y", package])
+        return run_command(pip_cmd + ["uninstall", "-y", package])
 
 
 def handle_npm(action, package):
+    global _NPM_CMD
+    if _NPM_CMD is None:
+        _NPM_CMD = shutil.which("npm") or "npm"
+    npm_cmd = _NPM_CMD
+
     if action == "list":
-        return run_command(["npm", "list", "--depth=0"])
+        return run_command([npm_cmd, "list", "--depth=0"])
 
     if not package:
         return "Error: 'package' parameter is required for install/uninstall."
 
     if action == "install":
-        return run_command(["npm", "install", package])
+        return run_command([npm_cmd, "install", package])
     elif action == "uninstall":
-        return run_command(["npm", "uninstall", package])
+        return run_command([npm_cmd, "uninstall", package])
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Package Manager Tool for IRon")
     parser.add_argument("--manager", choices=["pip", "npm"], required=True)
     parser.add_argument(
@@ -66,9 +73,13 @@ if __name__ == "__main__":
     )
     parser.add_argument("--package", default="", help="Name of the package")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.manager == "pip":
         print(handle_pip(args.action, args.package))
     elif args.manager == "npm":
         print(handle_npm(args.action, args.package))
+
+
+if __name__ == "__main__":
+    main()
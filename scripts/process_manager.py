@@ -1,36 +1,73 @@
 #!/usr/bin/env python3
 import argparse
 import os
+import re
 import signal
 import subprocess
 import sys
 
+try:  # optional: read the process table directly instead of forking ps
+    import psutil
+except ImportError:
+    psutil = None
+
 # ToolSchema: {"description": "Manage system processes: list running processes or kill them by PID.", "parameters": {"type": "object", "properties": {"action": {"type": "string", "enum": ["list", "kill"], "description": "Action to perform"}, "filter": {"type": "string", "description": "Filter process list by name or keyword (for 'list' action)"}, "pid": {"type": "integer", "description": "Process ID to kill (for 'kill' action)"}}, "required": ["action"]}}
 
 
+def process_lines():
+    """
+    Yields the process table as text lines, header first.
+    """
+    if psutil is not None:
+        attrs = ["pid", "username", "name", "cmdline", "memory_percent"]
+        yield f"{'USER':<12} {'PID':>7} {'%MEM':>5} COMMAND"
+        for p in psutil.process_iter(attrs):
+            info = p.info
+            # one process per line, like ps: fold newlines inside arguments
+            command = " ".join(info["cmdline"] or []).replace("\n", " ")
+            command = command or f"[{info['name']}]"
+            yield (
+                f"{(info['username'] or '?')[:12]:<12} {info['pid']:>7} "
+                f"{info['memory_percent'] or 0.0:>5.1f} {command}"
+            )
+        return
+
+    # Use standard ps command for cross-platform compatibility (Linux/macOS);
+    # stream its output instead of buffering the whole table
+    cmd = ["ps", "aux"]
+    with subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    ) as proc:
+        for line in proc.stdout:
+            yield line.rstrip("\n")
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
 def list_processes(keyword=""):
     try:
-        # Use standard ps command for cross-platform compatibility (Linux/macOS)
-        result = subprocess.run(
-            ["ps", "aux"], capture_output=True, text=True, check=True
-        )
-        lines = result.stdout.strip().split("\n")
+        lines = process_lines()
 
-        if not lines:
+        header = next(lines, None)
+        if header is None:
             return "No processes found."
 
-        header = lines[0]
         output = [header]
+        kw_re = re.compile(re.escape(keyword), re.IGNORECASE) if keyword else None
 
-        for line in lines[1:]:
-            if keyword.lower() in line.lower():
-                output.append(line)
+        # Limit output to avoid token overflow; past the cap only count matches
+        extra = 0
+        for line in lines:
+            if kw_re is None or kw_re.search(line):
+                if len(output) >= 25:
+                    extra += 1
+                else:
+                    output.append(line)
 
-        # Limit output to avoid token overflow
-        if len(output) > 25:
+        if extra:
             return (
-                "\n".join(output[:25])
-                + f"\n... (and {len(output) - 25} more, refine filter to see them)"
+                "\n".join(output)
+                + f"\n... (and {extra} more, refine filter to see them)"
             )
 
         return "\n".join(output)
@@ -53,15 +90,19 @@ def kill_process(pid):
         return f"Error killing process {pid}: {e}"
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Process Manager Tool for IRon")
     parser.add_argument("--action", choices=["list", "kill"], required=True)
     parser.add_argument("--filter", default="", help="Filter string for list action")
     parser.add_argument("--pid", type=int, help="Process ID to kill")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.action == "list":
         print(list_processes(args.filter))
     elif args.action == "kill":
         print(kill_process(args.pid))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,92 @@
 #!/usr/bin/env python3
 import argparse
 import os
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # ToolSchema: {"description": "Generate a compact tree-view map of the repository structure with file sizes to help the AI understand the project layout.", "parameters": {"type": "object", "properties": {"root": {"type": "string", "description": "Directory to map (defaults to current directory)"}, "depth": {"type": "integer", "description": "Max depth to recurse", "default": 3}}, "required": ["root"]}}
 
 
-def generate_map(root_path, max_depth=3, current_depth=0):
-    if current_depth > max_depth:
+# Common noise directories, skipped along with hidden entries
+SKIP_NAMES = {"node_modules", "vendor", "bin", "dist", "__pycache__", "venv"}
+
+# Directories with more files than this get their stat() calls overlapped on
+# a shared thread pool (stat releases the GIL; helps on cold/network disks)
+PARALLEL_STAT_MIN = 16
+_STAT_POOL = None
+
+
+def file_sizes(entries):
+    global _STAT_POOL
+    if len(entries) <= PARALLEL_STAT_MIN:
+        return [e.stat().st_size for e in entries]
+    if _STAT_POOL is None:
+        _STAT_POOL = ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) * 2))
+    return list(_STAT_POOL.map(lambda e: e.stat().st_size, entries))
+
+
+def scan_dir(path, depth):
+    """
+    Lists one directory as map lines, directories first.
+    Subdirectories come back as ("dir", path, depth) markers for the caller to
+    expand in place. Sizes are stat'ed up front so any error replaces the
+    whole directory's block, as the recursive version did.
+    """
+    with os.scandir(path) as it:
+        entries = sorted(it, key=lambda e: (not e.is_dir(), e.name.lower()))
+
+    indent = "  " * depth
+    items = []
+    files = []
+    for entry in entries:
+        if entry.name.startswith(".") or entry.name in SKIP_NAMES:
+            continue
+        if entry.is_dir():
+            items.append(f"{indent}📁 {entry.name}/")
+            items.append(("dir", entry.path, depth + 1))
+        else:
+            files.append(entry)
+
+    # files sort after directories, so they can be sized in one batch
+    for entry, size in zip(files, file_sizes(files)):
+        items.append(f"{indent}📄 {entry.name} ({size / 1024:.1f} KB)")
+    return items
+
+
+def generate_map(root_path, max_depth=3):
+    if max_depth < 0:
         return ""
+    if not os.path.exists(root_path):
+        return f"Error: Path {root_path} does not exist."
 
-    output = []
     try:
-        p = Path(root_path)
-        if not p.exists():
-            return f"Error: Path {root_path} does not exist."
-
-        # Sort items: directories first, then files
-        items = sorted(p.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
-
-        for item in items:
-            # Skip common noise directories and hidden files
-            if item.name.startswith(".") or item.name in {
-                "node_modules",
-                "vendor",
-                "bin",
-                "dist",
-                "__pycache__",
-                "venv",
-            }:
-                continue
-
-            indent = "  " * current_depth
-            if item.is_dir():
-                output.append(f"{indent}📁 {item.name}/")
-                subdir_map = generate_map(item, max_depth, current_depth + 1)
-                if subdir_map:
-                    output.append(subdir_map)
-            else:
-                size_kb = item.stat().st_size / 1024
-                output.append(f"{indent}📄 {item.name} ({size_kb:.1f} KB)")
-
+        items = scan_dir(root_path, 0)
     except Exception as e:
         return f"Error accessing {root_path}: {e}"
 
-    return "\n".join(filter(None, output))
+    # explicit stack instead of recursion; reversed so pops come out in order
+    output = []
+    stack = items[::-1]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            output.append(item)
+            continue
+        _, path, depth = item
+        if depth > max_depth:
+            continue
+        try:
+            stack.extend(reversed(scan_dir(path, depth)))
+        except Exception as e:
+            output.append(f"Error accessing {os.path.normpath(path)}: {e}")
 
+    return "\n".join(output)
 
-if __name__ == "__main__":
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Repository Mapper Tool for IRon")
     parser.add_argument("--root", default=".", help="Root directory to map")
     parser.add_argument("--depth", type=int, default=3, help="Maximum recursion depth")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # If the LLM passes "." or empty, use current working directory
     root_dir = args.root if args.root and args.root != "" else "."
@@ -59,3 +94,7 @@ if __name__ == "__main__":
     print(f"Project Map for: {os.path.abspath(root_dir)}\n" + "=" * 40)
     result = generate_map(root_dir, args.depth)
     print(result if result else "Directory is empty or inaccessible.")
+
+
+if __name__ == "__main__":
+    main()
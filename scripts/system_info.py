@@ -2,12 +2,48 @@
 import argparse
 import os
 import platform
+import re
 import shutil
 import sys
+import time
 from datetime import datetime
 
 # ToolSchema: {"description": "Get system performance metrics including disk, memory, OS info and load average.", "parameters": {"type": "object", "properties": {}}}
 
+# Only these /proc/meminfo fields are needed; values are in kB
+RE_MEM_TOTAL = re.compile(rb"^MemTotal:\s+(\d+)", re.M)
+RE_MEM_AVAILABLE = re.compile(rb"^MemAvailable:\s+(\d+)", re.M)
+RE_MEM_FREE = re.compile(rb"^MemFree:\s+(\d+)", re.M)
+
+# Host facts that never change within a process, gathered once at import
+_STATIC = {
+    "system": platform.system(),
+    "release": platform.release(),
+    "platform": platform.platform(),
+    "machine": platform.machine(),
+    "processor": platform.processor(),
+}
+
+# Last shutil.disk_usage("/") result, reused for repeat calls within 2s
+_DU_CACHE = {"t": 0.0, "v": None}
+
+
+def disk_usage_root():
+    now = time.monotonic()
+    if _DU_CACHE["v"] is None or now - _DU_CACHE["t"] > 2.0:
+        _DU_CACHE["v"] = shutil.disk_usage("/")
+        _DU_CACHE["t"] = now
+    return _DU_CACHE["v"]
+
+
+def meminfo_kb(data, *regexes):
+    """Value of the first field that is present, or 0."""
+    for regex in regexes:
+        m = regex.search(data)
+        if m:
+            return int(m.group(1))
+    return 0
+
 
 def get_stats():
     """
@@ -15,23 +51,18 @@ def get_stats():
     """
     try:
         # Disk Usage
-        total, used, free = shutil.disk_usage("/")
+        total, used, free = disk_usage_root()
         used_pct = (used / total) * 100
 
         # Memory stats (Linux fallback)
         mem_info = "Memory Info: Only detailed on Linux"
-        if platform.system() == "Linux":
+        if _STATIC["system"] == "Linux":
             try:
-                with open("/proc/meminfo", "r") as f:
-                    lines = f.readlines()
-                mem = {}
-                for line in lines:
-                    parts = line.split(":")
-                    if len(parts) == 2:
-                        mem[parts[0].strip()] = int(parts[1].split()[0].strip())
-
-                total_mem = mem.get("MemTotal", 0) / 1024  # MB
-                avail_mem = mem.get("MemAvailable", mem.get("MemFree", 0)) / 1024  # MB
+                with open("/proc/meminfo", "rb") as f:
+                    data = f.read()
+
+                total_mem = meminfo_kb(data, RE_MEM_TOTAL) / 1024  # MB
+                avail_mem = meminfo_kb(data, RE_MEM_AVAILABLE, RE_MEM_FREE) / 1024  # MB
                 used_mem = total_mem - avail_mem
                 mem_info = f"{used_mem / 1024:.1f} GB used / {total_mem / 1024:.1f} GB total ({avail_mem / 1024:.1f} GB available)"
             except Exception:
@@ -40,10 +71,10 @@ def get_stats():
         stats = [
             "=== System Health Report ===",
             f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"OS: {platform.system()} {platform.release()}",
-            f"Platform: {platform.platform()}",
-            f"Architecture: {platform.machine()}",
-            f"Processor: {platform.processor()}",
+            f"OS: {_STATIC['system']} {_STATIC['release']}",
+            f"Platform: {_STATIC['platform']}",
+            f"Architecture: {_STATIC['machine']}",
+            f"Processor: {_STATIC['processor']}",
             "",
             "--- Storage (Root /) ---",
             f"Total: {total // (2**30)} GB",
@@ -73,9 +104,13 @@ def get_stats():
         return f"Error collecting system information: {e}"
 
 
-if __name__ == "__main__":
+def main(argv=None):
     # No arguments needed for this tool but using argparse for consistency with IRon's bridge
     parser = argparse.ArgumentParser(description="System Information Tool for IRon")
-    args = parser.parse_args()
+    parser.parse_args(argv)
 
     print(get_stats())
+
+
+if __name__ == "__main__":
+    main()
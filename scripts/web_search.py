@@ -1,13 +1,20 @@
 #!/usr/bin/env python3
 import argparse
+import itertools
 import json
+import re
 import urllib.error
 import urllib.parse
-import urllib.request
+
+from _http import open_url
 
 # ToolSchema: {"description": "Search the web using DuckDuckGo to find latest information.", "parameters": {"type": "object", "properties": {"query": {"type": "string", "description": "The search query"}}, "required": ["query"]}}
 
 
+# Result snippets in DuckDuckGo's HTML endpoint: <a class="result__snippet" ...>text</a>
+_SNIPPET_RE = re.compile(rb'class="result__snippet[^>]*>(.*?)</a>', re.S)
+
+
 def search(query):
     # Using DuckDuckGo Lite to avoid strict bot detection and BeautifulSoup parsing
     headers = {
@@ -19,37 +26,27 @@ def search(query):
     # Let's use a simpler approach: querying a public DuckDuckGo-like API or doing rudimentary text extraction
 
     url = "https://html.duckduckgo.com/html/?q=" + urllib.parse.quote(query)
-    req = urllib.request.Request(url, headers=headers)
-
     try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            html = response.read().decode("utf-8", errors="ignore")
-
-            # Very rudimentary parsing without BS4
-            results = []
-            parts = html.split('class="result__snippet')
-
-            for part in parts[
-                1:6
-            ]:  # Skip first split (before any results), get up to 5
-                # Extract snippet
-                snippet_end = part.find("</a>")
-                if snippet_end == -1:
-                    continue
-                snippet = (
-                    part[part.find(">") + 1 : snippet_end]
-                    .replace("<b>", "")
-                    .replace("</b>", "")
-                    .strip()
-                )
-
-                # Look backwards for the title and link (which precede the snippet)
-                results.append(f"Result Snippet: {snippet}\n---")
-
-            if not results:
-                return "No results found or rate limited by search provider."
-
-            return "\n".join(results)
+        with open_url(url, headers) as response:
+            raw = response.read()
+
+        # Very rudimentary parsing without BS4: scan the raw bytes and only
+        # decode the (up to 5) snippets themselves
+        results = []
+        for m in itertools.islice(_SNIPPET_RE.finditer(raw), 5):
+            snippet = (
+                m.group(1)
+                .replace(b"<b>", b"")
+                .replace(b"</b>", b"")
+                .decode("utf-8", errors="ignore")
+                .strip()
+            )
+            results.append(f"Result Snippet: {snippet}\n---")
+
+        if not results:
+            return "No results found or rate limited by search provider."
+
+        return "\n".join(results)
 
     except urllib.error.HTTPError as e:
         return f"Search HTTP Error: {e.code} - {e.reason}"
@@ -59,9 +56,13 @@ def search(query):
         return f"Error performing web search: {e}"
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="DuckDuckGo Search Tool for IRon")
     parser.add_argument("--query", required=True, help="Search query")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     print(search(args.query))
+
+
+if __name__ == "__main__":
+    main()